@@ -8,13 +8,16 @@ This tool validates research findings from:
 3. Code Testing: Feature-based automated testing
 
 Usage:
-    python simple_benchmark.py --experiment [amoeba|spl-db-sync|code-testing|all] --dataset [sample|full]
+    python simple_benchmark.py --experiment [amoeba|spl-db-sync|code-testing|sweep|all] --dataset [sample|full] [--resume]
 """
 
 import argparse
+import json
+import statistics
 import time
 import os
 import sys
+import threading
 import mysql.connector
 from pathlib import Path
 import subprocess
@@ -30,20 +33,299 @@ DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# Adaptive sampling: repeat each query until the 95% confidence interval is
+# narrow enough or its time budget runs out
+SAMPLING_DEFAULTS = {
+    'target_ci': 0.05,      # CI half-width relative to the mean
+    'time_budget': 60.0,    # seconds of measurement per query
+    'min_runs': 3,
+    'max_runs': 30,
+    'warmup_runs': 1        # discarded cold-cache runs, outside the budget
+}
+
+# Two-sided 95% Student t critical values by degrees of freedom
+T_CRITICAL_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571,
+    6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    15: 2.131, 20: 2.086, 30: 2.042
+}
+
+CHECKPOINT_FILE = 'benchmark_checkpoint.json'
+
+# Session-level optimizer settings compared by the sweep experiment.
+# Each preset is applied with SET SESSION before the timed query.
+MB = 1024 * 1024
+SESSION_SETTINGS = {
+    'default': {},
+    'no_semijoin': {'optimizer_switch': 'semijoin=off'},
+    'no_materialization': {'optimizer_switch': 'materialization=off'},
+    'no_firstmatch': {'optimizer_switch': 'firstmatch=off'},
+    'subquery_to_derived': {'optimizer_switch': 'subquery_to_derived=on'},
+    # MySQL 8.0.20+ turns hash joins off through block_nested_loop
+    'no_hash_join': {'optimizer_switch': 'block_nested_loop=off'},
+    'join_buffer_64m': {'join_buffer_size': 64 * MB},
+    # In-memory temporary tables are capped by the smaller of the two
+    'tmp_table_256m': {'tmp_table_size': 256 * MB, 'max_heap_table_size': 256 * MB},
+    'sort_buffer_32m': {'sort_buffer_size': 32 * MB}
+}
+
+# Resource sampling: /proc is read at this interval (seconds) while each query runs
+RESOURCE_INTERVAL = 0.1
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+MYSQLD_NAMES = ('mysqld', 'mariadbd')
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
 def get_connection():
     """Get database connection with timeout"""
     return mysql.connector.connect(**DB_CONFIG)
 
-def execute_query_with_timeout(query, timeout=60):
-    """Execute query with timeout and return results"""
+def apply_session_settings(cursor, session_settings):
+    """Apply session variables (names come from SESSION_SETTINGS, values are bound)"""
+    for variable, value in session_settings.items():
+        cursor.execute(f"SET SESSION {variable} = %s", (value,))
+
+def is_mysqld_process(pid, proc_root='/proc'):
+    """Check that a pid belongs to a running mysqld (or mariadbd) process"""
+    try:
+        return Path(proc_root, str(pid), 'comm').read_text().strip() in MYSQLD_NAMES
+    except OSError:
+        return False
+
+def query_mysqld_pid(proc_root='/proc'):
+    """Ask the server behind DB_CONFIG for its pid file and read it.
+    
+    Returns None when the server is unreachable or its pid file is not visible
+    from this host (e.g. mysqld runs in a container).
+    """
     try:
         conn = get_connection()
         cursor = conn.cursor()
+        cursor.execute("SELECT @@pid_file, @@datadir")
+        pid_file, datadir = cursor.fetchone()
+        cursor.close()
+        conn.close()
+    except mysql.connector.Error:
+        return None
+    
+    # A relative pid_file is resolved against the data directory
+    pid_path = Path(datadir or '', pid_file or '')
+    try:
+        pid = int(pid_path.read_text().strip())
+    except (OSError, ValueError):
+        return None
+    
+    return pid if is_mysqld_process(pid, proc_root) else None
+
+def find_mysqld_pids(proc_root='/proc'):
+    """List all local mysqld processes by name"""
+    proc_dir = Path(proc_root)
+    if not proc_dir.exists():
+        return []
+    
+    return sorted(int(entry.name) for entry in proc_dir.iterdir()
+                  if entry.name.isdigit() and is_mysqld_process(entry.name, proc_root))
+
+def read_process_stats(pid, proc_root='/proc'):
+    """Read CPU, memory, I/O and context-switch counters of a process from /proc"""
+    proc_dir = Path(proc_root, str(pid))
+    try:
+        stat = (proc_dir / 'stat').read_text()
+        status = (proc_dir / 'status').read_text()
+    except OSError:
+        return None
+    
+    # The process name may contain spaces, so split after its closing parenthesis;
+    # utime and stime are fields 14 and 15 of the full line
+    fields = stat[stat.rfind(')') + 2:].split()
+    stats = {
+        'cpu_user': int(fields[11]) / CLOCK_TICKS,
+        'cpu_sys': int(fields[12]) / CLOCK_TICKS,
+        'rss_bytes': None,
+        'swap_bytes': None,
+        'voluntary_ctxt_switches': None,
+        'nonvoluntary_ctxt_switches': None,
+        'read_bytes': None,
+        'write_bytes': None
+    }
+    
+    for line in status.splitlines():
+        key, _, value = line.partition(':')
+        if key == 'VmRSS':
+            stats['rss_bytes'] = int(value.split()[0]) * 1024
+        elif key == 'VmSwap':
+            stats['swap_bytes'] = int(value.split()[0]) * 1024
+        elif key in ('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches'):
+            stats[key] = int(value)
+    
+    # /proc/<pid>/io is only readable for our own processes (or as root)
+    try:
+        for line in (proc_dir / 'io').read_text().splitlines():
+            key, _, value = line.partition(':')
+            if key in ('read_bytes', 'write_bytes'):
+                stats[key] = int(value)
+    except OSError:
+        pass
+    
+    return stats
+
+def read_host_stats(proc_root='/proc'):
+    """Read host-wide I/O wait and swap counters from /proc"""
+    stats = {'iowait': None, 'swap_in_pages': None, 'swap_out_pages': None}
+    try:
+        cpu_fields = Path(proc_root, 'stat').read_text().splitlines()[0].split()
+        stats['iowait'] = int(cpu_fields[5]) / CLOCK_TICKS
+        for line in Path(proc_root, 'vmstat').read_text().splitlines():
+            key, value = line.split()
+            if key == 'pswpin':
+                stats['swap_in_pages'] = int(value)
+            elif key == 'pswpout':
+                stats['swap_out_pages'] = int(value)
+    except (OSError, IndexError, ValueError):
+        pass
+    return stats
+
+def counter_delta(first, last, key):
+    """Difference of a cumulative counter between two samples, None if unavailable"""
+    if first.get(key) is None or last.get(key) is None:
+        return None
+    return last[key] - first[key]
+
+class ResourceSampler:
+    """Background thread that samples /proc for the given processes and the host"""
+    
+    def __init__(self, pids, interval):
+        self.pids = pids
+        self.interval = interval
+        self.series = {name: [] for name in pids}
+        self.host_series = []
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._start_time = None
+    
+    def _sample(self):
+        elapsed = time.time() - self._start_time
+        for name, pid in self.pids.items():
+            stats = read_process_stats(pid)
+            if stats:
+                stats['t'] = elapsed
+                self.series[name].append(stats)
+        host_stats = read_host_stats()
+        host_stats['t'] = elapsed
+        self.host_series.append(host_stats)
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+    
+    def start(self):
+        self._start_time = time.time()
+        self._sample()
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sampling and return per-process aggregates and time series"""
+        self._stop_event.set()
+        self._thread.join()
+        self._sample()
+        return self.summary()
+    
+    def summary(self):
+        wall_time = self.host_series[-1]['t'] if self.host_series else 0.0
+        processes = {}
+        
+        for name, series in self.series.items():
+            if not series:
+                continue
+            first, last = series[0], series[-1]
+            rss = [s['rss_bytes'] for s in series if s['rss_bytes'] is not None]
+            swap = [s['swap_bytes'] for s in series if s['swap_bytes'] is not None]
+            cpu_user = last['cpu_user'] - first['cpu_user']
+            cpu_sys = last['cpu_sys'] - first['cpu_sys']
+            processes[name] = {
+                'aggregates': {
+                    'cpu_user': cpu_user,
+                    'cpu_sys': cpu_sys,
+                    'cpu_utilization': (cpu_user + cpu_sys) / wall_time if wall_time > 0 else None,
+                    'read_bytes': counter_delta(first, last, 'read_bytes'),
+                    'write_bytes': counter_delta(first, last, 'write_bytes'),
+                    'voluntary_ctxt_switches': counter_delta(first, last, 'voluntary_ctxt_switches'),
+                    'nonvoluntary_ctxt_switches': counter_delta(first, last, 'nonvoluntary_ctxt_switches'),
+                    'rss_peak': max(rss) if rss else None,
+                    'rss_mean': statistics.mean(rss) if rss else None,
+                    'swap_peak': max(swap) if swap else None
+                },
+                'series': series
+            }
+        
+        first, last = self.host_series[0], self.host_series[-1]
+        return {
+            'interval': self.interval,
+            'wall_time': wall_time,
+            'processes': processes,
+            'host': {
+                'aggregates': {
+                    'iowait': counter_delta(first, last, 'iowait'),
+                    'swap_in_pages': counter_delta(first, last, 'swap_in_pages'),
+                    'swap_out_pages': counter_delta(first, last, 'swap_out_pages')
+                },
+                'series': self.host_series
+            }
+        }
+
+def summarize_resource_runs(runs):
+    """Combine resource aggregates over repeated runs: maximum for peaks, mean for the rest"""
+    sections = {}
+    for run in runs:
+        for name, process in run['processes'].items():
+            sections.setdefault(name, []).append(process['aggregates'])
+        sections.setdefault('host', []).append(run['host']['aggregates'])
+    
+    summary = {}
+    for name, aggregates in sections.items():
+        summary[name] = {}
+        for key in aggregates[0]:
+            values = [a[key] for a in aggregates if a.get(key) is not None]
+            if not values:
+                summary[name][key] = None
+            elif key.endswith('_peak'):
+                summary[name][key] = max(values)
+            else:
+                summary[name][key] = statistics.mean(values)
+    return summary
+
+def format_bytes(num_bytes):
+    """Human-readable byte count"""
+    if num_bytes is None:
+        return "n/a"
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(num_bytes) < 1024 or unit == 'GB':
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+def execute_query_with_timeout(query, timeout=60, session_settings=None, resource_pids=None,
+                               resource_interval=RESOURCE_INTERVAL):
+    """Execute query with timeout and return results.
+    
+    resource_pids maps names to process ids sampled from /proc while the query runs.
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        
+        if session_settings:
+            apply_session_settings(cursor, session_settings)
+        
+        sampler = ResourceSampler(resource_pids, resource_interval) if resource_pids else None
+        if sampler:
+            sampler.start()
         
         start_time = time.time()
-        cursor.execute(query)
-        results = cursor.fetchall()
-        execution_time = time.time() - start_time
+        try:
+            cursor.execute(query)
+            results = cursor.fetchall()
+            execution_time = time.time() - start_time
+        finally:
+            resources = sampler.stop() if sampler else None
         
         cursor.close()
         conn.close()
@@ -52,7 +334,8 @@ def execute_query_with_timeout(query, timeout=60):
             'success': True,
             'execution_time': execution_time,
             'row_count': len(results),
-            'error': None
+            'error': None,
+            'resources': resources
         }
         
     except mysql.connector.Error as e:
@@ -60,16 +343,177 @@ def execute_query_with_timeout(query, timeout=60):
             'success': False,
             'execution_time': None,
             'row_count': 0,
-            'error': f"{e.errno} ({e.sqlstate}): {e.msg}"
+            'error': f"{e.errno} ({e.sqlstate}): {e.msg}",
+            'resources': None
         }
     except Exception as e:
         return {
             'success': False,
             'execution_time': None,
             'row_count': 0,
-            'error': str(e)
+            'error': str(e),
+            'resources': None
         }
 
+def t_critical(df):
+    """Return the 95% t critical value, rounding df down to the nearest tabulated value"""
+    if df > 30:
+        return 1.96
+    return T_CRITICAL_95[max(k for k in T_CRITICAL_95 if k <= df)]
+
+def confidence_half_width(samples):
+    """Half-width of the 95% confidence interval of the mean, None for fewer than 2 samples"""
+    if len(samples) < 2:
+        return None
+    return t_critical(len(samples) - 1) * statistics.stdev(samples) / len(samples) ** 0.5
+
+def measure_query_adaptive(query, sampling, session_settings=None):
+    """Repeat a query until its confidence interval is narrow enough or its time budget runs out.
+    
+    Warm-up runs fill the buffer pool and caches; they are discarded and not charged to the budget.
+    """
+    for _ in range(sampling.get('warmup_runs', 0)):
+        result = execute_query_with_timeout(query, session_settings=session_settings)
+        if not result['success']:
+            return result
+    
+    samples = []
+    resources = []
+    row_count = 0
+    half_width = None
+    budget_start = time.time()
+    
+    while len(samples) < sampling['max_runs']:
+        result = execute_query_with_timeout(query, session_settings=session_settings,
+                                            resource_pids=sampling.get('resource_pids'),
+                                            resource_interval=sampling.get('resource_interval', RESOURCE_INTERVAL))
+        if not result['success']:
+            return result
+        
+        samples.append(result['execution_time'])
+        row_count = result['row_count']
+        if result['resources']:
+            resources.append(result['resources'])
+        mean = statistics.mean(samples)
+        half_width = confidence_half_width(samples)
+        
+        # Precise enough?
+        if (len(samples) >= sampling['min_runs'] and half_width is not None
+                and half_width <= sampling['target_ci'] * mean):
+            break
+        
+        # Would another run overshoot the budget? Expensive queries stop early,
+        # but never before min_runs so a CI always exists when min_runs >= 2
+        elapsed = time.time() - budget_start
+        if len(samples) >= sampling['min_runs'] and elapsed + mean > sampling['time_budget']:
+            break
+    
+    return {
+        'success': True,
+        'execution_time': statistics.mean(samples),
+        'row_count': row_count,
+        'error': None,
+        'runs': len(samples),
+        'samples': samples,
+        'ci_half_width': half_width,
+        'resource_summary': summarize_resource_runs(resources) if resources else None,
+        'resources': resources
+    }
+
+def load_checkpoint(path, resume):
+    """Load completed measurements when resuming, otherwise start with an empty checkpoint.
+    
+    Resource time series go to a JSON Lines file next to the checkpoint. A fresh
+    start never deletes existing files: they are moved aside to <file>.bak.
+    """
+    series_path = str(Path(path).with_suffix('.resources.jsonl'))
+    cells = {}
+    if resume:
+        if Path(path).exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                cells = json.load(f).get('cells', {})
+            print(f"♻️ Resuming from {path}: {len(cells)} completed measurements")
+        else:
+            print(f"⚠️ No checkpoint found at {path}, starting from scratch")
+    else:
+        for old_path in [path, series_path]:
+            if Path(old_path).exists():
+                os.replace(old_path, old_path + '.bak')
+                print(f"🗄️ Previous {old_path} moved to {old_path}.bak")
+    return {'path': path, 'series_path': series_path, 'cells': cells}
+
+def save_checkpoint(checkpoint):
+    """Write the checkpoint atomically so an interrupted write never corrupts it"""
+    tmp_path = checkpoint['path'] + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'cells': checkpoint['cells']}, f)
+    os.replace(tmp_path, checkpoint['path'])
+
+def append_resource_series(checkpoint, cell_key, runs):
+    """Append the per-run resource time series of one cell to the JSON Lines file"""
+    with open(checkpoint['series_path'], 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'cell': cell_key, 'runs': runs}) + "\n")
+
+def run_measurement(query_file, dataset, sampling, checkpoint, config='default'):
+    """Measure one (query, dataset, config) cell, reusing it from the checkpoint if already done.
+    
+    config names a SESSION_SETTINGS preset applied before every run.
+    """
+    cell_key = f"{Path(query_file).as_posix()}|{dataset}|{config}"
+    
+    if cell_key in checkpoint['cells']:
+        print("    ↩️ Restored from checkpoint")
+        return checkpoint['cells'][cell_key]
+    
+    query = load_query(query_file, dataset)
+    if not query:
+        return None
+    
+    result = measure_query_adaptive(query, sampling, SESSION_SETTINGS[config])
+    
+    # Only the resource summary stays in the checkpoint; the bulky series are appended separately
+    runs = result.pop('resources', None)
+    
+    # Failed cells are not checkpointed so they are retried on resume.
+    # The checkpoint is saved before the series are appended: an interruption in
+    # between can lose a cell's series but never duplicates its record on --resume.
+    if result['success']:
+        checkpoint['cells'][cell_key] = result
+        save_checkpoint(checkpoint)
+        if runs:
+            append_resource_series(checkpoint, cell_key, runs)
+    
+    return result
+
+def print_measurement(result):
+    """Print the outcome of a measurement"""
+    if result['success']:
+        spread = f" ± {result['ci_half_width']:.4f}" if result.get('ci_half_width') is not None else ""
+        print(f"    ✓ Query completed in {result['execution_time']:.4f}s{spread} "
+              f"over {result.get('runs', 1)} run(s) ({result['row_count']} rows)")
+        if result.get('resource_summary'):
+            print_resource_summary(result['resource_summary'])
+    else:
+        print(f"    ✗ Query failed: {result['error']}")
+
+def print_resource_summary(summary):
+    """Print per-run mean resource usage of the sampled processes and the host"""
+    for name, stats in summary.items():
+        if name == 'host':
+            continue
+        utilization = stats['cpu_utilization']
+        cpu = f"{utilization * 100:.0f}%" if utilization is not None else "n/a"
+        ctx = stats['voluntary_ctxt_switches'], stats['nonvoluntary_ctxt_switches']
+        ctx_text = "/".join("n/a" if c is None else f"{c:.0f}" for c in ctx)
+        print(f"    🖥️ {name}: CPU {cpu} (user {stats['cpu_user']:.2f}s, sys {stats['cpu_sys']:.2f}s), "
+              f"read {format_bytes(stats['read_bytes'])}, write {format_bytes(stats['write_bytes'])}, "
+              f"peak RSS {format_bytes(stats['rss_peak'])}, ctx switches {ctx_text} (vol/invol)")
+    
+    host = summary.get('host')
+    if host and host['iowait'] is not None:
+        swap = "/".join("n/a" if v is None else f"{v:.0f}" for v in (host['swap_in_pages'], host['swap_out_pages']))
+        print(f"    🖥️ host: iowait {host['iowait']:.2f}s, swap in/out {swap} pages")
+
 def load_query(file_path, dataset):
     """Load SQL query and substitute table placeholders"""
     try:
@@ -105,7 +549,7 @@ def load_query(file_path, dataset):
         print(f"❌ Error loading query {file_path}: {e}")
         return None
 
-def run_amoeba_experiment(dataset):
+def run_amoeba_experiment(dataset, sampling, checkpoint):
     """Run AMOEBA experiment: Subquery vs JOIN performance"""
     print("============================================================")
     print("🔬 AMOEBA EXPERIMENT: Subquery vs JOIN Performance")
@@ -137,17 +581,13 @@ def run_amoeba_experiment(dataset):
             query_name = query_file.stem
             print(f"Executing {query_file.name}...")
             
-            query = load_query(query_file, dataset)
-            if not query:
+            result = run_measurement(query_file, dataset, sampling, checkpoint)
+            if not result:
                 continue
-                
-            result = execute_query_with_timeout(query)
             
+            print_measurement(result)
             if result['success']:
-                print(f"    ✓ Query completed in {result['execution_time']:.4f}s ({result['row_count']} rows)")
                 pair_results[query_name] = result
-            else:
-                print(f"    ✗ Query failed: {result['error']}")
                 
         # Compare results
         if len(pair_results) == 2:
@@ -198,7 +638,7 @@ def run_amoeba_experiment(dataset):
     
     return results
 
-def run_spl_db_sync_experiment(dataset):
+def run_spl_db_sync_experiment(dataset, sampling, checkpoint):
     """Run SPL-DB-Sync experiment: Modular vs Flat query performance"""
     print("============================================================")
     print("🏗️ SPL-DB-SYNC EXPERIMENT: Modular vs Flat Query Performance")
@@ -227,25 +667,19 @@ def run_spl_db_sync_experiment(dataset):
         
         # Execute modular query
         print(f"Executing modular_{query_name}.sql...")
-        modular_query = load_query(modular_file, dataset)
-        if modular_query:
-            modular_result = execute_query_with_timeout(modular_query)
+        modular_result = run_measurement(modular_file, dataset, sampling, checkpoint)
+        if modular_result:
+            print_measurement(modular_result)
             if modular_result['success']:
-                print(f"    ✓ Query completed in {modular_result['execution_time']:.4f}s ({modular_result['row_count']} rows)")
                 pair_results['modular'] = modular_result
-            else:
-                print(f"    ✗ Query failed: {modular_result['error']}")
         
         # Execute flat query
         print(f"Executing flat_{query_name}.sql...")
-        flat_query = load_query(flat_file, dataset)
-        if flat_query:
-            flat_result = execute_query_with_timeout(flat_query)
+        flat_result = run_measurement(flat_file, dataset, sampling, checkpoint)
+        if flat_result:
+            print_measurement(flat_result)
             if flat_result['success']:
-                print(f"    ✓ Query completed in {flat_result['execution_time']:.4f}s ({flat_result['row_count']} rows)")
                 pair_results['flat'] = flat_result
-            else:
-                print(f"    ✗ Query failed: {flat_result['error']}")
         
         # Compare results
         if len(pair_results) == 2:
@@ -288,6 +722,133 @@ def run_spl_db_sync_experiment(dataset):
     
     return results
 
+def sweep_query_files():
+    """List (label, file) for every AMOEBA and SPL-DB-Sync query covered by the sweep"""
+    query_files = []
+    
+    pair_dirs = [d for d in Path("AMOEBA/pairs").iterdir() if d.is_dir() and not d.name.startswith('4_')]
+    for pair_dir in sorted(pair_dirs):
+        for query_file in sorted(pair_dir.glob("*.sql")):
+            query_files.append((query_file.stem, query_file))
+    
+    for variant in ['modular', 'flat']:
+        for query_file in sorted(Path(f"SPL-DB-Sync/{variant}_benchmark").glob("*.sql")):
+            query_files.append((f"{variant}_{query_file.stem}", query_file))
+    
+    return query_files
+
+def run_settings_sweep(dataset, sampling, checkpoint, setting_names):
+    """Run Settings Sweep: every query under every session settings preset"""
+    print("============================================================")
+    print("🎛️ SETTINGS SWEEP: Optimizer Switches and Server Variables")
+    print("🎯 Goal: Find the best session settings per query")
+    print("============================================================")
+    print()
+    
+    # Every cell needs a CI to be compared, so take at least two timed runs regardless of budget
+    sweep_sampling = dict(sampling,
+                          min_runs=max(2, sampling['min_runs']),
+                          max_runs=max(2, sampling['max_runs']))
+    
+    matrix = {}
+    
+    for label, query_file in sweep_query_files():
+        print(f"--- Testing {label} ---")
+        matrix[label] = {}
+        
+        for setting_name in setting_names:
+            print(f"Executing {query_file.name} with {setting_name}...")
+            
+            result = run_measurement(query_file, dataset, sweep_sampling, checkpoint, config=setting_name)
+            if not result:
+                continue
+            
+            print_measurement(result)
+            if result['success']:
+                matrix[label][setting_name] = {
+                    'mean': result['execution_time'],
+                    'ci_half_width': result.get('ci_half_width')
+                }
+        
+        print()
+    
+    print_sweep_matrix(matrix, setting_names)
+    return matrix
+
+def best_significant_setting(cells):
+    """Return the fastest preset whose 95% CI lies entirely below the default's, else None.
+    
+    Presets measured only once have no CI and can never be named a winner.
+    """
+    default = cells.get('default')
+    if not default or default['ci_half_width'] is None:
+        return None
+    
+    default_lower = default['mean'] - default['ci_half_width']
+    winners = [
+        name for name, cell in cells.items()
+        if name != 'default' and cell['ci_half_width'] is not None
+        and cell['mean'] + cell['ci_half_width'] < default_lower
+    ]
+    return min(winners, key=lambda name: cells[name]['mean']) if winners else None
+
+def print_sweep_matrix(matrix, setting_names):
+    """Print the query x setting timing matrix and the best settings per query"""
+    print("======================================================================")
+    print("📊 SETTINGS SWEEP MATRIX (mean seconds, * = significantly faster than default)")
+    print("======================================================================")
+    
+    label_width = max([len(label) for label in matrix] + [len("query")])
+    column_widths = {name: max(len(name), 8) for name in setting_names}
+    
+    header = "query".ljust(label_width) + "".join(f"  {name:>{column_widths[name]}}" for name in setting_names)
+    print(header)
+    print("-" * len(header))
+    
+    for label, cells in matrix.items():
+        best_setting = best_significant_setting(cells)
+        row = label.ljust(label_width)
+        for name in setting_names:
+            if name in cells:
+                cell = f"{cells[name]['mean']:.4f}" + ("*" if name == best_setting else " ")
+            else:
+                cell = "failed "
+            row += f"  {cell:>{column_widths[name]}}"
+        print(row)
+    
+    print()
+    print("🏆 Best session settings per query:")
+    for label, cells in matrix.items():
+        if not cells:
+            print(f"   {label}: no successful measurement")
+            continue
+        
+        if 'default' not in cells:
+            print(f"   {label}: no default measurement to compare against")
+            continue
+        
+        best_setting = best_significant_setting(cells)
+        if not best_setting:
+            # Cells restored from older checkpoints may have a single run and no CI
+            fastest = min(cells, key=lambda name: cells[name]['mean'])
+            untested = [name for name, cell in cells.items()
+                        if cell['ci_half_width'] is None
+                        and cell['mean'] <= cells['default']['mean']]
+            if cells['default']['ci_half_width'] is None or untested:
+                print(f"   {label}: insufficient runs, not tested for significance "
+                      f"(fastest mean: {fastest}, {cells[fastest]['mean']:.4f}s)")
+            else:
+                print(f"   {label}: no significant difference from default")
+            continue
+        
+        default_time = cells['default']['mean']
+        best_time = cells[best_setting]['mean']
+        improvement = ((default_time - best_time) / default_time) * 100
+        settings = ", ".join(f"{k}={v}" for k, v in SESSION_SETTINGS[best_setting].items())
+        print(f"   {label}: {best_setting} ({best_time:.4f}s), {improvement:.1f}% faster than default "
+              f"[{settings}]")
+    print()
+
 def run_code_testing_experiment():
     """Run Code Testing experiment: Feature-based automated testing"""
     print("============================================================")
@@ -465,6 +1026,38 @@ def print_summary(amoeba_results, spl_results, code_results):
         else:
             print("   ❌ Poor validation. Check queries and database setup.")
 
+def resolve_resource_pids(interval):
+    """Pick the processes to sample from /proc, None when sampling is off or unavailable"""
+    if interval <= 0:
+        print("🖥️ Resource sampling: disabled")
+        return None
+    if not Path('/proc').exists():
+        print("🖥️ Resource sampling: unavailable (no /proc on this host)")
+        return None
+    
+    resource_pids = {}
+    if DB_CONFIG['host'] not in LOCAL_HOSTS:
+        print(f"🖥️ Resource sampling: server is not on this host, client only every {interval}s")
+    else:
+        # Prefer the pid the server reports; the name scan is only trusted if unambiguous
+        mysqld_pid = query_mysqld_pid()
+        source = "from @@pid_file"
+        if not mysqld_pid:
+            candidates = find_mysqld_pids()
+            mysqld_pid = candidates[0] if len(candidates) == 1 else None
+            source = "by process name"
+        
+        if mysqld_pid:
+            resource_pids['mysqld'] = mysqld_pid
+            print(f"🖥️ Resource sampling: mysqld (pid {mysqld_pid}, {source}) and client every {interval}s")
+        elif candidates:
+            print(f"⚠️ Resource sampling: {len(candidates)} mysqld processes and none matches "
+                  f"@@pid_file, client only every {interval}s")
+        else:
+            print(f"🖥️ Resource sampling: mysqld not found on this host, client only every {interval}s")
+    resource_pids['client'] = os.getpid()
+    return resource_pids
+
 def main():
     parser = argparse.ArgumentParser(
         description='🔬 Database Performance Research Validation Tool',
@@ -475,11 +1068,15 @@ Examples:
   python simple_benchmark.py --experiment amoeba --dataset full
   python simple_benchmark.py --experiment spl-db-sync --dataset sample
   python simple_benchmark.py --experiment code-testing
+  python simple_benchmark.py --experiment all --dataset full --time-budget 120 --fresh
+  python simple_benchmark.py --experiment all --dataset full --resume
+  python simple_benchmark.py --experiment sweep --dataset full
+  python simple_benchmark.py --experiment sweep --settings default,no_semijoin,no_materialization
         """
     )
     
     parser.add_argument('--experiment', 
-                       choices=['amoeba', 'spl-db-sync', 'code-testing', 'all'],
+                       choices=['amoeba', 'spl-db-sync', 'code-testing', 'sweep', 'all'],
                        required=True,
                        help='Which experiment to run')
     
@@ -488,31 +1085,130 @@ Examples:
                        default='sample',
                        help='Dataset size to use (default: sample)')
     
+    parser.add_argument('--target-ci',
+                       type=float,
+                       default=SAMPLING_DEFAULTS['target_ci'],
+                       help='Stop repeating a query once its 95%% CI half-width is below this fraction '
+                            'of the mean (default: %(default)s)')
+    
+    parser.add_argument('--time-budget',
+                       type=float,
+                       default=SAMPLING_DEFAULTS['time_budget'],
+                       help='Seconds of repeated measurement allowed per query once --min-runs '
+                            'are done (default: %(default)s)')
+    
+    parser.add_argument('--min-runs',
+                       type=int,
+                       default=SAMPLING_DEFAULTS['min_runs'],
+                       help='Runs per query that always execute, even past the time budget '
+                            '(default: %(default)s)')
+    
+    parser.add_argument('--max-runs',
+                       type=int,
+                       default=SAMPLING_DEFAULTS['max_runs'],
+                       help='Upper bound on runs per query (default: %(default)s)')
+    
+    parser.add_argument('--warmup-runs',
+                       type=int,
+                       default=SAMPLING_DEFAULTS['warmup_runs'],
+                       help='Discarded runs per query before measuring, not counted toward the '
+                            'time budget (default: %(default)s)')
+    
+    parser.add_argument('--checkpoint',
+                       default=CHECKPOINT_FILE,
+                       help='File that stores progress after every measurement (default: %(default)s)')
+    
+    checkpoint_mode = parser.add_mutually_exclusive_group()
+    checkpoint_mode.add_argument('--resume',
+                       action='store_true',
+                       help='Skip (query, dataset, config) cells already completed in the checkpoint; '
+                            'also use it to add another experiment to an existing checkpoint')
+    
+    checkpoint_mode.add_argument('--fresh',
+                       action='store_true',
+                       help='Start a new checkpoint, moving an existing one aside to <checkpoint>.bak')
+    
+    parser.add_argument('--settings',
+                       default=','.join(SESSION_SETTINGS),
+                       help='Comma-separated session settings presets for the sweep experiment '
+                            f'(default: all of {", ".join(SESSION_SETTINGS)})')
+    
+    parser.add_argument('--resource-interval',
+                       type=float,
+                       default=RESOURCE_INTERVAL,
+                       help='Seconds between /proc samples of mysqld and the client during each '
+                            'query, 0 disables sampling (default: %(default)s)')
+    
     args = parser.parse_args()
     
+    # Only the timed experiments use the checkpoint; code-testing must never touch it
+    measured = args.experiment in ['amoeba', 'spl-db-sync', 'sweep', 'all']
+    
+    if (measured and Path(args.checkpoint).exists()
+            and not (args.resume or args.fresh)):
+        parser.error(f"checkpoint {args.checkpoint} already exists; pass --resume to continue it "
+                     "or --fresh to start over (the old file is kept as .bak)")
+    
+    if args.min_runs < 1 or args.max_runs < args.min_runs:
+        parser.error('--min-runs must be at least 1 and not greater than --max-runs')
+    
+    if args.warmup_runs < 0:
+        parser.error('--warmup-runs must not be negative')
+    
+    setting_names = [name.strip() for name in args.settings.split(',') if name.strip()]
+    unknown_settings = [name for name in setting_names if name not in SESSION_SETTINGS]
+    if unknown_settings or not setting_names:
+        parser.error(f"--settings must list presets from: {', '.join(SESSION_SETTINGS)}")
+    
+    sampling = {
+        'target_ci': args.target_ci,
+        'time_budget': args.time_budget,
+        'min_runs': args.min_runs,
+        'max_runs': args.max_runs,
+        'warmup_runs': args.warmup_runs,
+        'resource_pids': None,
+        'resource_interval': args.resource_interval
+    }
+    
     print("======================================================================")
     print("🚀 DATABASE PERFORMANCE RESEARCH VALIDATION")
     if args.experiment != 'code-testing':
         print(f"📊 Dataset: {args.dataset}")
     print("⏱️ Timeout: 60s")
+    if measured:
+        print(f"🎯 Sampling: ±{args.target_ci * 100:.1f}% CI, {args.time_budget:.0f}s budget, "
+              f"{args.min_runs}-{args.max_runs} runs per query after {args.warmup_runs} warm-up run(s)")
+        sampling['resource_pids'] = resolve_resource_pids(args.resource_interval)
     print("======================================================================")
     
     start_time = time.time()
     
+    checkpoint = load_checkpoint(args.checkpoint, args.resume) if measured else None
+    
     amoeba_results = []
     spl_results = []
     code_results = []
     
-    if args.experiment in ['amoeba', 'all']:
-        amoeba_results = run_amoeba_experiment(args.dataset)
-    
-    if args.experiment in ['spl-db-sync', 'all']:
-        spl_results = run_spl_db_sync_experiment(args.dataset)
-    
-    if args.experiment in ['code-testing', 'all']:
-        code_results = run_code_testing_experiment()
+    try:
+        if args.experiment in ['amoeba', 'all']:
+            amoeba_results = run_amoeba_experiment(args.dataset, sampling, checkpoint)
+        
+        if args.experiment in ['spl-db-sync', 'all']:
+            spl_results = run_spl_db_sync_experiment(args.dataset, sampling, checkpoint)
+        
+        if args.experiment in ['code-testing', 'all']:
+            code_results = run_code_testing_experiment()
+        
+        if args.experiment == 'sweep':
+            run_settings_sweep(args.dataset, sampling, checkpoint, setting_names)
+    except KeyboardInterrupt:
+        print()
+        print(f"⏹️ Interrupted. Completed measurements are saved in {args.checkpoint}")
+        print("   Rerun the same command with --resume to continue.")
+        sys.exit(130)
     
-    print_summary(amoeba_results, spl_results, code_results)
+    if args.experiment != 'sweep':
+        print_summary(amoeba_results, spl_results, code_results)
     
     total_time = time.time() - start_time
     print(f"\n⏱️ Total execution time: {total_time:.2f} seconds")
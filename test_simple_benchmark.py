@@ -0,0 +1,360 @@
+import json
+
+import pytest
+
+import simple_benchmark as sb
+
+
+class FakeClock:
+    """Stands in for time.time so budgets can be tested without sleeping"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def fake_executor(clock, times):
+    """Return an execute_query_with_timeout replacement that 'runs' for the given durations"""
+    durations = iter(times)
+
+    def execute(query, timeout=60, session_settings=None, resource_pids=None,
+                resource_interval=sb.RESOURCE_INTERVAL):
+        duration = next(durations)
+        clock.now += duration
+        return {'success': True, 'execution_time': duration, 'row_count': 5,
+                'error': None, 'resources': None}
+
+    return execute
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(sb.time, 'time', fake.time)
+    return fake
+
+
+def sampling(**overrides):
+    settings = dict(sb.SAMPLING_DEFAULTS, warmup_runs=0)
+    settings.update(overrides)
+    return settings
+
+
+def test_t_critical_uses_table_and_rounds_down():
+    assert sb.t_critical(1) == 12.706
+    assert sb.t_critical(10) == 2.228
+    assert sb.t_critical(12) == 2.228
+    assert sb.t_critical(30) == 2.042
+    assert sb.t_critical(31) == 1.96
+
+
+def test_confidence_half_width():
+    assert sb.confidence_half_width([]) is None
+    assert sb.confidence_half_width([1.0]) is None
+    assert sb.confidence_half_width([2.0, 2.0, 2.0]) == 0.0
+    # stdev([1, 2, 3]) == 1, df == 2
+    assert sb.confidence_half_width([1.0, 2.0, 3.0]) == pytest.approx(4.303 / 3 ** 0.5)
+
+
+def test_stops_at_min_runs_once_ci_is_narrow(monkeypatch, clock):
+    monkeypatch.setattr(sb, 'execute_query_with_timeout', fake_executor(clock, [1.0] * 30))
+    result = sb.measure_query_adaptive("SELECT 1", sampling(min_runs=3))
+    assert result['runs'] == 3
+    assert result['execution_time'] == 1.0
+    assert result['ci_half_width'] == 0.0
+
+
+def test_stops_at_max_runs_when_ci_stays_wide(monkeypatch, clock):
+    monkeypatch.setattr(sb, 'execute_query_with_timeout', fake_executor(clock, [1.0, 2.0] * 10))
+    result = sb.measure_query_adaptive("SELECT 1", sampling(max_runs=6, time_budget=1000.0))
+    assert result['runs'] == 6
+
+
+def test_stops_before_next_run_would_overshoot_budget(monkeypatch, clock):
+    monkeypatch.setattr(sb, 'execute_query_with_timeout', fake_executor(clock, [10.0, 14.0, 12.0]))
+    result = sb.measure_query_adaptive("SELECT 1", sampling(min_runs=2, time_budget=30.0))
+    # After two runs 24s are spent and a third (mean 12s) would exceed 30s
+    assert result['samples'] == [10.0, 14.0]
+
+
+def test_budget_never_cuts_below_min_runs(monkeypatch, clock):
+    monkeypatch.setattr(sb, 'execute_query_with_timeout', fake_executor(clock, [40.0, 44.0, 42.0, 41.0]))
+    result = sb.measure_query_adaptive("SELECT 1", sampling(min_runs=3, time_budget=60.0))
+    # The first run already exhausts most of the budget, yet min_runs still execute
+    assert result['samples'] == [40.0, 44.0, 42.0]
+    assert result['ci_half_width'] is not None
+
+
+def test_warmup_runs_are_discarded_and_not_charged_to_budget(monkeypatch, clock):
+    monkeypatch.setattr(sb, 'execute_query_with_timeout', fake_executor(clock, [50.0] + [1.0] * 30))
+    result = sb.measure_query_adaptive("SELECT 1", sampling(warmup_runs=1, time_budget=10.0))
+    assert 50.0 not in result['samples']
+    assert result['runs'] == 3
+
+
+def test_failure_is_returned_unchanged(monkeypatch):
+    failure = {'success': False, 'execution_time': None, 'row_count': 0,
+               'error': 'boom', 'resources': None}
+    monkeypatch.setattr(sb, 'execute_query_with_timeout', lambda *args, **kwargs: failure)
+    assert sb.measure_query_adaptive("SELECT 1", sampling()) is failure
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = sb.load_checkpoint(path, resume=True)
+    assert checkpoint['cells'] == {}
+
+    checkpoint['cells']['q.sql|sample|default'] = {'success': True, 'execution_time': 0.5}
+    sb.save_checkpoint(checkpoint)
+
+    assert not (tmp_path / "checkpoint.json.tmp").exists()
+    restored = sb.load_checkpoint(path, resume=True)
+    assert restored['cells'] == checkpoint['cells']
+
+
+def test_fresh_checkpoint_moves_old_file_aside(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text(json.dumps({'cells': {'q.sql|full|default': {'success': True}}}))
+
+    checkpoint = sb.load_checkpoint(str(path), resume=False)
+
+    assert checkpoint['cells'] == {}
+    assert not path.exists()
+    assert json.loads((tmp_path / "checkpoint.json.bak").read_text())['cells']
+
+
+def test_best_setting_requires_non_overlapping_ci():
+    cells = {
+        'default': {'mean': 1.00, 'ci_half_width': 0.05},
+        'no_semijoin': {'mean': 0.93, 'ci_half_width': 0.05},
+        'join_buffer_64m': {'mean': 0.80, 'ci_half_width': 0.05},
+        'sort_buffer_32m': {'mean': 0.50, 'ci_half_width': None}
+    }
+    assert sb.best_significant_setting(cells) == 'join_buffer_64m'
+
+    del cells['join_buffer_64m']
+    assert sb.best_significant_setting(cells) is None
+
+
+def test_best_setting_needs_a_default_ci():
+    cells = {
+        'default': {'mean': 1.00, 'ci_half_width': None},
+        'no_semijoin': {'mean': 0.10, 'ci_half_width': 0.01}
+    }
+    assert sb.best_significant_setting(cells) is None
+
+
+def test_resource_summary_keeps_true_peak():
+    def run(cpu_user, rss_peak):
+        return {
+            'processes': {'mysqld': {'aggregates': {'cpu_user': cpu_user, 'rss_peak': rss_peak,
+                                                    'read_bytes': None}}},
+            'host': {'aggregates': {'iowait': 0.5}}
+        }
+
+    summary = sb.summarize_resource_runs([run(1.0, 100), run(3.0, 300)])
+    assert summary['mysqld'] == {'cpu_user': 2.0, 'rss_peak': 300, 'read_bytes': None}
+    assert summary['host'] == {'iowait': 0.5}
+
+
+def fake_proc(proc_root, processes):
+    """Build a /proc tree with a comm file for each pid"""
+    for pid, comm in processes.items():
+        (proc_root / str(pid)).mkdir(parents=True)
+        (proc_root / str(pid) / 'comm').write_text(comm + "\n")
+    return str(proc_root)
+
+
+class FakeConnection:
+    def __init__(self, row):
+        self.row = row
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+def test_find_mysqld_pids_lists_every_server(tmp_path):
+    proc_root = fake_proc(tmp_path, {12: 'bash', 40: 'mysqld', 7: 'mariadbd'})
+    assert sb.find_mysqld_pids(proc_root) == [7, 40]
+
+
+def test_query_mysqld_pid_reads_pid_file_relative_to_datadir(tmp_path, monkeypatch):
+    proc_root = fake_proc(tmp_path / 'proc', {40: 'mysqld', 41: 'mysqld'})
+    datadir = tmp_path / 'data'
+    datadir.mkdir()
+    (datadir / 'host.pid').write_text("41\n")
+    monkeypatch.setattr(sb, 'get_connection', lambda: FakeConnection(('host.pid', str(datadir))))
+
+    assert sb.query_mysqld_pid(proc_root) == 41
+
+
+def test_query_mysqld_pid_rejects_stale_pid_file(tmp_path, monkeypatch):
+    proc_root = fake_proc(tmp_path / 'proc', {41: 'bash'})
+    (tmp_path / 'mysqld.pid').write_text("41\n")
+    monkeypatch.setattr(sb, 'get_connection',
+                        lambda: FakeConnection((str(tmp_path / 'mysqld.pid'), '/var/lib/mysql')))
+
+    assert sb.query_mysqld_pid(proc_root) is None
+
+
+def test_resource_series_are_kept_out_of_the_checkpoint(tmp_path, monkeypatch):
+    query_file = tmp_path / "q.sql"
+    query_file.write_text("SELECT 1")
+    runs = [{'processes': {}, 'host': {'aggregates': {}, 'series': [{'t': 0.0}]}}]
+    monkeypatch.setattr(sb, 'measure_query_adaptive', lambda *args: {
+        'success': True, 'execution_time': 0.5, 'resource_summary': {}, 'resources': runs})
+
+    checkpoint = sb.load_checkpoint(str(tmp_path / "checkpoint.json"), resume=False)
+    result = sb.run_measurement(query_file, 'sample', sb.SAMPLING_DEFAULTS, checkpoint)
+
+    assert 'resources' not in result
+    saved = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert 'resources' not in list(saved['cells'].values())[0]
+    line = json.loads((tmp_path / "checkpoint.resources.jsonl").read_text())
+    assert line['runs'] == runs
+
+
+# Canned /proc content; the process name contains a space and a parenthesis
+# to check that fields are split after the last ')'
+PROC_STAT = ("4242 (my sqld) S 1 4242 4242 0 -1 4194560 100 0 0 0 "
+             "250 75 0 0 20 0 38 0 1000 2000000000 100000 18446744073709551615\n")
+PROC_STATUS = """Name:\tmysqld
+VmPeak:\t 2000000 kB
+VmRSS:\t  409600 kB
+VmSwap:\t    1024 kB
+voluntary_ctxt_switches:\t1500
+nonvoluntary_ctxt_switches:\t42
+"""
+PROC_IO = """rchar: 999999
+wchar: 888888
+syscr: 10
+syscw: 20
+read_bytes: 1048576
+write_bytes: 4096
+cancelled_write_bytes: 0
+"""
+HOST_STAT = """cpu  1000 20 300 50000 700 0 10 0 0 0
+cpu0 500 10 150 25000 350 0 5 0 0 0
+"""
+HOST_VMSTAT = """nr_free_pages 12345
+pswpin 11
+pswpout 22
+"""
+
+
+def test_read_process_stats_field_offsets(tmp_path):
+    proc_dir = tmp_path / '4242'
+    proc_dir.mkdir()
+    (proc_dir / 'stat').write_text(PROC_STAT.replace('(my sqld)', '(my) sqld)'))
+    (proc_dir / 'status').write_text(PROC_STATUS)
+    (proc_dir / 'io').write_text(PROC_IO)
+
+    stats = sb.read_process_stats(4242, str(tmp_path))
+
+    assert stats['cpu_user'] == pytest.approx(250 / sb.CLOCK_TICKS)
+    assert stats['cpu_sys'] == pytest.approx(75 / sb.CLOCK_TICKS)
+    assert stats['rss_bytes'] == 409600 * 1024
+    assert stats['swap_bytes'] == 1024 * 1024
+    assert stats['voluntary_ctxt_switches'] == 1500
+    assert stats['nonvoluntary_ctxt_switches'] == 42
+    assert stats['read_bytes'] == 1048576
+    assert stats['write_bytes'] == 4096
+
+
+def test_read_process_stats_without_io_access(tmp_path):
+    proc_dir = tmp_path / '4242'
+    proc_dir.mkdir()
+    (proc_dir / 'stat').write_text(PROC_STAT)
+    (proc_dir / 'status').write_text(PROC_STATUS)
+
+    stats = sb.read_process_stats(4242, str(tmp_path))
+
+    assert stats['cpu_user'] == pytest.approx(250 / sb.CLOCK_TICKS)
+    assert stats['read_bytes'] is None
+    assert stats['write_bytes'] is None
+
+
+def test_read_process_stats_of_vanished_process(tmp_path):
+    assert sb.read_process_stats(4242, str(tmp_path)) is None
+
+
+def test_read_host_stats_field_offsets(tmp_path):
+    (tmp_path / 'stat').write_text(HOST_STAT)
+    (tmp_path / 'vmstat').write_text(HOST_VMSTAT)
+
+    stats = sb.read_host_stats(str(tmp_path))
+
+    assert stats['iowait'] == pytest.approx(700 / sb.CLOCK_TICKS)
+    assert stats['swap_in_pages'] == 11
+    assert stats['swap_out_pages'] == 22
+
+
+def test_code_testing_leaves_existing_checkpoint_alone(tmp_path, monkeypatch):
+    checkpoint = tmp_path / sb.CHECKPOINT_FILE
+    checkpoint.write_text(json.dumps({'cells': {'q.sql|full|default': {'success': True}}}))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sb, 'run_code_testing_experiment', lambda: [])
+    monkeypatch.setattr(sb.sys, 'argv', ['simple_benchmark.py', '--experiment', 'code-testing'])
+
+    sb.main()
+
+    assert json.loads(checkpoint.read_text())['cells']
+    assert not list(tmp_path.glob('*.bak'))
+
+
+def test_sweep_reports_single_run_default_as_untested(capsys):
+    matrix = {'1A_nested_in': {
+        'default': {'mean': 40.0, 'ci_half_width': None},
+        'no_semijoin': {'mean': 5.0, 'ci_half_width': 0.2}
+    }}
+    sb.print_sweep_matrix(matrix, ['default', 'no_semijoin'])
+    output = capsys.readouterr().out
+    assert "no significant difference" not in output
+    assert "insufficient runs" in output and "no_semijoin" in output
+
+
+def test_sweep_takes_at_least_two_runs_per_cell(monkeypatch):
+    seen = []
+
+    def fake_run_measurement(query_file, dataset, sampling, checkpoint, config='default'):
+        seen.append((sampling['min_runs'], sampling['max_runs']))
+        return {'success': True, 'execution_time': 1.0, 'ci_half_width': 0.1, 'row_count': 5}
+
+    monkeypatch.setattr(sb, 'run_measurement', fake_run_measurement)
+    monkeypatch.setattr(sb, 'sweep_query_files', lambda: [('q', sb.Path('q.sql'))])
+    sb.run_settings_sweep('full', sampling(min_runs=1, max_runs=1), {}, ['default'])
+
+    assert seen == [(2, 2)]
+
+
+def test_interrupted_series_write_is_not_duplicated_on_resume(tmp_path, monkeypatch):
+    query_file = tmp_path / "q.sql"
+    query_file.write_text("SELECT 1")
+    runs = [{'processes': {}, 'host': {'aggregates': {}, 'series': []}}]
+    monkeypatch.setattr(sb, 'measure_query_adaptive', lambda *args: {
+        'success': True, 'execution_time': 0.5, 'resource_summary': {}, 'resources': list(runs)})
+
+    def interrupted(*args):
+        raise KeyboardInterrupt
+
+    path = str(tmp_path / "checkpoint.json")
+    monkeypatch.setattr(sb, 'append_resource_series', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        sb.run_measurement(query_file, 'sample', sb.SAMPLING_DEFAULTS, sb.load_checkpoint(path, resume=False))
+
+    monkeypatch.undo()
+    monkeypatch.setattr(sb, 'measure_query_adaptive', lambda *args: pytest.fail("cell re-measured"))
+    sb.run_measurement(query_file, 'sample', sb.SAMPLING_DEFAULTS, sb.load_checkpoint(path, resume=True))
+
+    assert not (tmp_path / "checkpoint.resources.jsonl").exists()